@@ -1,4 +1,25 @@
-from .dbapi import ConnectionManager, DBDriver, connect
+from typing import TYPE_CHECKING
+
+from .drivers import DBDriver
+
+if TYPE_CHECKING:
+    from .dbapi import Connection, ConnectionManager, connect
+
+# sqlalchemy and sqlmodel are only imported when the database api is used.
+_LAZY_ATTRIBUTES = ("Connection", "ConnectionManager", "connect")
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        from . import dbapi
+
+        return getattr(dbapi, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 # Global constants for the database module
 SQLITE = DBDriver.SQLITE
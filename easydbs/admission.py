@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+from .exceptions import AdmissionRejectedError
+
+
+class _Waiter:
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+        self.start = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Limit the number of concurrent calls made through a connection.
+    Calls that can not run immediately wait in a bounded queue, served by
+    priority (higher first) then in arrival order. A call is rejected with
+    AdmissionRejectedError when the queue is full or when its wait is longer
+    than the timeout.
+    Works for threads and asyncio tasks, and both can share the same limits.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int = 0,
+        timeout: Optional[float] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("The parameter 'max_concurrency' must be at least 1.")
+        if max_queue < 0:
+            raise ValueError("The parameter 'max_queue' can not be negative.")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: list[tuple[int, int, _Waiter]] = []
+        self._counter = itertools.count()
+        self._admitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def metrics(self) -> dict:
+        """Return the current state and the counters of the controller."""
+        with self._lock:
+            return {
+                "active": self._active,
+                "queue_depth": len(self._waiters),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "total_wait": self._total_wait,
+                "max_wait": self._max_wait,
+            }
+
+    def acquire(self, priority: int = 0):
+        """Wait for a slot, blocking the current thread."""
+        event = threading.Event()
+        waiter = self._enqueue(priority, event.set)
+        if waiter is None:
+            return
+        try:
+            event.wait(self.timeout)
+        except BaseException:
+            if self._cancel(waiter):
+                self.release()
+            raise
+        self._resolve(waiter)
+
+    async def acquire_async(self, priority: int = 0):
+        """Wait for a slot without blocking the event loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+
+        waiter = self._enqueue(priority, wake)
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if self._cancel(waiter):
+                self.release()
+            raise
+        self._resolve(waiter)
+
+    def release(self):
+        """Free a slot, handing it to the next waiter if there is one."""
+        with self._lock:
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                waiter.granted = True
+                try:
+                    waiter.wake()
+                except RuntimeError:
+                    # The event loop of an async waiter is closed: nobody will
+                    # use the slot, give it to the next waiter.
+                    continue
+                self._record_admission(waiter)
+                return
+            self._active -= 1
+
+    def _enqueue(self, priority: int, wake: Callable[[], None]) -> _Waiter | None:
+        """Take a free slot and return None, or return the queued waiter."""
+        with self._lock:
+            if self._active < self.max_concurrency and not self._waiters:
+                self._active += 1
+                self._admitted += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejectedError(
+                    f"Too many concurrent calls: {self._active} running and "
+                    f"{len(self._waiters)} waiting."
+                )
+            waiter = _Waiter(wake)
+            heapq.heappush(self._waiters, (-priority, next(self._counter), waiter))
+            return waiter
+
+    def _resolve(self, waiter: _Waiter):
+        """Raise AdmissionRejectedError if the waiter did not get a slot."""
+        if not self._cancel(waiter):
+            with self._lock:
+                self._rejected += 1
+            raise AdmissionRejectedError(
+                f"No slot available after waiting {self.timeout} seconds."
+            )
+
+    def _cancel(self, waiter: _Waiter) -> bool:
+        """
+        Remove a waiter from the queue. Return True if it already got a slot.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters = [item for item in self._waiters if item[2] is not waiter]
+            heapq.heapify(self._waiters)
+            return False
+
+    def _record_admission(self, waiter: _Waiter):
+        wait = time.monotonic() - waiter.start
+        self._admitted += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
-import asyncio
-from enum import Enum
-from typing import Any, Optional, overload
+import inspect
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from typing import Any, Iterator, Optional, Union, overload
 
 import sqlalchemy
 import sqlmodel
 from sqlmodel import Session, SQLModel
 
-
-class DBDriver(Enum):
-    SQLITE = "sqlite"
-    MYSQL = "mysql+pymysql"
-    POSTGRE = "postgresql+psycopg2"
-    DUCKDB = "duckdb"
-    MSSQL = "mssql+pyodbc"
-    MARIADB = "mysql+pymysql"
+from .admission import AdmissionController
+from .drivers import DBDriver
+from .mirror import Mirror, _refresh_interval
+from .pagination import OrderBy, Page, paginate
+from .spill import ArrowResult, fetch_arrow
 
 
 def connect(
@@ -173,21 +173,37 @@ class Connection(SQLAlchemyDatabase):
             query=query,
         )
         self._raw_connection = self.engine.raw_connection()
+        self._pid = os.getpid()
+        self.admission: AdmissionController | None = None
         self.id = f"{self.connection_string.get_backend_name()}+{self.connection_string.database}"
 
     def __repr__(self):
         return f"<Connection(db_type={self.db_type}, db_name={self.database}, engine={self.engine})>"
 
-    def __call__(self, func):
-        """Decorator to manage sessions for both sync and async functions."""
-        if asyncio.iscoroutinefunction(func):
+    def __call__(self, func=None, *, priority: int = 0):
+        """
+        Decorator to manage sessions for both sync and async functions.
+        Can be used as @conn or @conn(priority=...) when the concurrency of
+        the connection is limited.
+        """
+        if func is None:
+            return lambda func: self(func, priority=priority)
+
+        if inspect.iscoroutinefunction(func):
 
             async def async_wrapped(*args, **kwargs):
-                session = self.session()
+                admission = self.admission
+                if admission:
+                    await admission.acquire_async(priority)
                 try:
-                    result = await func(session, *args, **kwargs)
+                    session = self.session()
+                    try:
+                        result = await func(session, *args, **kwargs)
+                    finally:
+                        session.close()
                 finally:
-                    session.close()
+                    if admission:
+                        admission.release()
                 return result
 
             return async_wrapped
@@ -195,34 +211,77 @@ class Connection(SQLAlchemyDatabase):
         else:
 
             def sync_wrapped(*args, **kwargs):
-                session = self.session()
+                admission = self.admission
+                if admission:
+                    admission.acquire(priority)
                 try:
-                    result = func(session, *args, **kwargs)
+                    session = self.session()
+                    try:
+                        result = func(session, *args, **kwargs)
+                    finally:
+                        session.close()
                 finally:
-                    session.close()
+                    if admission:
+                        admission.release()
                 return result
 
             return sync_wrapped
 
+    def limit_concurrency(
+        self,
+        max_concurrency: int,
+        max_queue: int = 0,
+        timeout: Optional[float] = None,
+    ) -> AdmissionController:
+        """
+        Limit the number of concurrent calls of the functions decorated by the
+        connection. Extra calls wait in a queue of max_queue calls, and are
+        rejected with AdmissionRejectedError when the queue is full or after
+        timeout seconds. Metrics are available with conn.admission.metrics().
+        """
+        self.admission = AdmissionController(max_concurrency, max_queue, timeout)
+        return self.admission
+
     def connect(self):
         """Connects and returns the connection object."""
+        self._check_fork()
+        if self._raw_connection is None:
+            self._raw_connection = self.engine.raw_connection()
         return self._raw_connection
 
     def close(self):
         """Disposes the engine and closes the connection."""
+        self._check_fork()
         self.engine.dispose()
 
     def commit(self):
         """Commits the current transaction."""
-        return self._raw_connection.commit()
+        return self.connect().commit()
 
     def cursor(self):
         """Returns a Cursor object."""
-        return self._raw_connection.cursor()
+        return self.connect().cursor()
 
     def rollback(self):
         """Rolls back the current transaction."""
-        return self._raw_connection.rollback()
+        return self.connect().rollback()
+
+    def _check_fork(self):
+        """Reset the engine if the connection was inherited through fork()."""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+
+    def _reset_after_fork(self):
+        """
+        Drop the pool and the raw connection inherited from the parent process.
+        The inherited sockets are never closed here: closing them from the child
+        would terminate the parent's sessions.
+        """
+        self.engine.dispose(close=False)
+        if self._raw_connection is not None:
+            _FORK_INHERITED.append(self._raw_connection)
+        self._raw_connection = None
+        self._pid = os.getpid()
 
     def session(self) -> Session:
         """Return a sqlmodel (or sqlalchemy) session."""
@@ -237,12 +296,14 @@ class Connection(SQLAlchemyDatabase):
 
             return _wrap
 
+        self._check_fork()
         session = Session(self.engine)
         session.exec = wrapper(session.exec)
         return session
 
     def create_tables(self, tables_names: list[str] | None = None):
         """Create a list of tables of all tables in the SQLModel."""
+        self._check_fork()
         if tables_names:
             tables = [
                 SQLModel.metadata.tables.get(table)
@@ -253,6 +314,178 @@ class Connection(SQLAlchemyDatabase):
         else:
             SQLModel.metadata.create_all(self.engine)
 
+    def parallel_read(
+        self,
+        table: str,
+        partition_column: str,
+        partitions: int = 4,
+        processes: int | None = None,
+    ) -> Iterator[list[tuple]]:
+        """
+        Read a table split in ranges of an integer column (usually the primary
+        key). Each range is fetched in a separate process and yielded as a list
+        of rows, in the order of the ranges. Rows where the column is NULL are
+        yielded last, in their own partition.
+        In-memory databases can not be shared between processes.
+        """
+        if partitions < 1:
+            raise ValueError("The parameter 'partitions' must be at least 1.")
+        self._check_fork()
+        column = sqlalchemy.column(partition_column)
+        query = sqlalchemy.select(
+            sqlalchemy.func.min(column),
+            sqlalchemy.func.max(column),
+            sqlalchemy.func.count() - sqlalchemy.func.count(column),
+        ).select_from(sqlalchemy.table(table))
+        with self.engine.connect() as conn:
+            low, high, nulls = conn.execute(query).one()
+
+        bounds = []
+        if low is not None:
+            if not isinstance(low, int) or not isinstance(high, int):
+                raise ValueError(
+                    f"The partition column '{partition_column}' must be an integer column."
+                )
+            step = -(-(high - low + 1) // partitions)
+            bounds = [
+                (start, min(start + step, high + 1))
+                for start in range(low, high + 1, step)
+            ]
+        if nulls:
+            bounds.append((None, None))
+        if not bounds:
+            return iter(())
+        url = self.connection_string.render_as_string(hide_password=False)
+        return _read_partitions(url, table, partition_column, bounds, processes)
+
+    def paginate(
+        self,
+        statement: Any,
+        order_by: list[OrderBy] | None = None,
+        page_size: int = 100,
+        after: Optional[str] = None,
+    ) -> Page:
+        """
+        Return a page of a select (or of a SQLModel class), sorted by order_by
+        then by the primary key. Pass page.next_cursor as after to get the next
+        page. Unlike OFFSET, the cost of a page does not grow with its depth.
+        """
+        with self.session() as session:
+            return paginate(session, statement, order_by, page_size, after)
+
+    def fetch_arrow(
+        self,
+        query: Any,
+        params: Optional[dict] = None,
+        memory_budget: int = 256 * 1024 * 1024,
+        batch_size: int = 10_000,
+        schema=None,
+    ) -> ArrowResult:
+        """
+        Fetch the result of a query in arrow record batches. Batches beyond
+        memory_budget bytes are spilled to a memory-mapped temporary file.
+        Requires pyarrow.
+        """
+        self._check_fork()
+        return fetch_arrow(
+            self.engine, query, params, memory_budget, batch_size, schema
+        )
+
+    def mirror(
+        self,
+        tables: list[str | type[SQLModel]],
+        target: DBDriver = DBDriver.DUCKDB,
+        database: Optional[str] = None,
+        refresh: Union[float, timedelta, None] = None,
+        batch_size: int = 10_000,
+    ) -> Mirror:
+        """
+        Copy tables in a local DuckDB or SQLite database, added to the
+        connection manager. The copy is refreshed with mirror.refresh(), or
+        every refresh seconds. Without database, a temporary file is used,
+        deleted by mirror.close().
+        """
+        if target not in (DBDriver.DUCKDB, DBDriver.SQLITE):
+            raise ValueError("The mirror target must be easydbs.DUCKDB or easydbs.SQLITE.")
+        refresh = _refresh_interval(refresh)
+        tmpdir = None
+        if database is None:
+            tmpdir = tempfile.mkdtemp(prefix="easydbs-mirror-")
+            database = os.path.join(tmpdir, f"mirror.{target.value}")
+        names = [getattr(table, "__tablename__", table) for table in tables]
+        cm = ConnectionManager()
+        local = cm.add_connection(db_type=target, database=database)
+        try:
+            return Mirror(
+                self, local, names, refresh=refresh, batch_size=batch_size, tmpdir=tmpdir
+            )
+        except Exception:
+            cm.close(local.id)
+            if tmpdir is not None:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+
+
+# Raw connections inherited through fork(). They are kept referenced so that
+# they are never garbage collected (and closed) in the child process.
+_FORK_INHERITED: list = []
+
+
+def _read_partitions(
+    url: str,
+    table: str,
+    partition_column: str,
+    bounds: list[tuple[Optional[int], Optional[int]]],
+    processes: int | None,
+) -> Iterator[list[tuple]]:
+    """
+    Fetch the partitions in a process pool. The partitions not started yet
+    are cancelled when the caller stops iterating.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=processes)
+    futures = [
+        executor.submit(_read_partition, url, table, partition_column, start, stop)
+        for start, stop in bounds
+    ]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def _read_partition(
+    url: str,
+    table: str,
+    partition_column: str,
+    start: Optional[int],
+    stop: Optional[int],
+) -> list[tuple]:
+    """
+    Fetch the rows of a table where start <= partition_column < stop, or
+    where partition_column is NULL when start is None.
+    """
+    engine = sqlalchemy.create_engine(url)
+    column = sqlalchemy.column(partition_column)
+    condition = column.is_(None) if start is None else column >= start
+    query = (
+        sqlalchemy.select(sqlalchemy.text("*"))
+        .select_from(sqlalchemy.table(table))
+        .where(condition)
+        .order_by(column)
+    )
+    if start is not None:
+        query = query.where(column < stop)
+    try:
+        with engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(query)]
+    finally:
+        engine.dispose()
+
 
 
 class ConnectionManager:
@@ -268,6 +501,13 @@ class ConnectionManager:
             cls._instance._connections = {}
         return cls._instance
 
+    def _after_fork(self):
+        """
+        Reset the engines of all the connections in a forked child process.
+        """
+        for conn in self._connections.values():
+            conn._reset_after_fork()
+
     def __init__(self):
         """
         Initialize ConnectionManager.
@@ -307,3 +547,12 @@ class ConnectionManager:
         """
         for name in self.connections():
             self.close(name)
+
+
+def _reset_connections_after_fork():
+    if ConnectionManager._instance is not None:
+        ConnectionManager._instance._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_connections_after_fork)
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class DBDriver(Enum):
+    SQLITE = "sqlite"
+    MYSQL = "mysql+pymysql"
+    POSTGRE = "postgresql+psycopg2"
+    DUCKDB = "duckdb"
+    MSSQL = "mssql+pyodbc"
+    MARIADB = "mysql+pymysql"
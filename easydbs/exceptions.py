@@ -46,3 +46,8 @@ class ProgrammingError(DatabaseError):
 class NotSupportedError(DatabaseError):
     """Exception for unsupported operations by the database."""
     pass
+
+
+class AdmissionRejectedError(OperationalError):
+    """Exception raised when a call is rejected by the admission control of a connection."""
+    pass
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import shutil
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional, Union
+
+import sqlalchemy
+
+if TYPE_CHECKING:
+    from .dbapi import Connection
+
+
+def _portable_type(type_: sqlalchemy.types.TypeEngine) -> sqlalchemy.types.TypeEngine:
+    """Return the generic sqlalchemy type of a dialect specific type."""
+    try:
+        return type_.as_generic()
+    except NotImplementedError:
+        return type_
+
+
+def _refresh_interval(refresh: Union[float, timedelta, None]) -> Optional[float]:
+    """Return the refresh interval in seconds, which must be positive."""
+    if isinstance(refresh, timedelta):
+        refresh = refresh.total_seconds()
+    if refresh is not None and not refresh > 0:
+        raise ValueError("The parameter 'refresh' must be None or a positive duration.")
+    return refresh
+
+
+class Mirror:
+    """
+    Local copy of remote tables in an embedded database (DuckDB or SQLite).
+    Tables are copied when the mirror is created, then with refresh(), or
+    every refresh seconds in a background thread. tmpdir is a directory owned
+    by the mirror, removed by close().
+    """
+
+    def __init__(
+        self,
+        source: Connection,
+        target: Connection,
+        tables: list[str],
+        refresh: Union[float, timedelta, None] = None,
+        batch_size: int = 10_000,
+        tmpdir: Optional[str] = None,
+    ):
+        self.source = source
+        self.connection = target
+        self.tables = tables
+        self.batch_size = batch_size
+        self.tmpdir = tmpdir
+        self.last_refresh: Optional[datetime] = None
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        refresh = _refresh_interval(refresh)
+        self.refresh()
+        if refresh is not None:
+            self._thread = threading.Thread(
+                target=self._refresh_loop, args=(refresh,), daemon=True
+            )
+            self._thread.start()
+
+    def __repr__(self):
+        return f"<Mirror(tables={self.tables}, connection={self.connection})>"
+
+    def refresh(self, tables: list[str] | None = None):
+        """Copy again the tables (all the mirrored tables by default)."""
+        with self._lock:
+            for table in tables or self.tables:
+                self._copy_table(table)
+            self.last_refresh = datetime.now()
+
+    def stop(self):
+        """Stop the scheduled refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """
+        Stop the scheduled refresh, close the local connection and remove it
+        from the connection manager, then delete the temporary directory.
+        """
+        from .dbapi import ConnectionManager
+
+        self.stop()
+        cm = ConnectionManager()
+        if self.connection in cm.connections():
+            cm.close(self.connection.id)
+        else:
+            self.connection.close()
+        if self.tmpdir is not None:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+            self.tmpdir = None
+
+    def _refresh_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+
+    def _copy_table(self, name: str):
+        """
+        Copy a table in a temporary table, then replace the local table in the
+        same transaction, so readers never see a partial copy.
+        """
+        self.source._check_fork()
+        self.connection._check_fork()
+        source_table = sqlalchemy.Table(
+            name, sqlalchemy.MetaData(), autoload_with=self.source.engine
+        )
+        tmp_name = f"{name}__easydbs_mirror"
+        tmp_table = sqlalchemy.Table(
+            tmp_name,
+            sqlalchemy.MetaData(),
+            *[
+                sqlalchemy.Column(
+                    column.name,
+                    _portable_type(column.type),
+                    primary_key=column.primary_key,
+                    nullable=column.nullable,
+                    autoincrement=False,
+                )
+                for column in source_table.columns
+            ],
+        )
+        preparer = self.connection.engine.dialect.identifier_preparer
+        with self.connection.engine.begin() as dst:
+            tmp_table.drop(dst, checkfirst=True)
+            tmp_table.create(dst)
+            with self.source.engine.connect() as src:
+                result = src.execution_options(
+                    stream_results=True, yield_per=self.batch_size
+                ).execute(sqlalchemy.select(source_table))
+                for rows in result.partitions(self.batch_size):
+                    dst.execute(tmp_table.insert(), [row._asdict() for row in rows])
+            sqlalchemy.Table(name, sqlalchemy.MetaData()).drop(dst, checkfirst=True)
+            dst.exec_driver_sql(
+                f"ALTER TABLE {preparer.quote(tmp_name)} RENAME TO {preparer.quote(name)}"
+            )
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Optional, Union
+
+import sqlalchemy
+import sqlmodel
+from sqlalchemy.sql import operators
+from sqlmodel import Session
+from sqlmodel.sql.expression import SelectOfScalar
+
+OrderBy = Union[str, sqlalchemy.ColumnElement]
+
+_DECODERS = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "decimal": Decimal,
+    "uuid": uuid.UUID,
+}
+
+
+class Page:
+    """A page of results and the cursor of the next page (None on the last page)."""
+
+    def __init__(self, items: list, next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return f"<Page(items={len(self.items)}, next_cursor={self.next_cursor!r})>"
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _encode_value(value: Any):
+    # datetime is tested before date because it is a subclass of date.
+    for name, type_ in (
+        ("datetime", datetime),
+        ("date", date),
+        ("time", time),
+    ):
+        if isinstance(value, type_):
+            return {"$": name, "v": value.isoformat()}
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return {"$": type(value).__name__.lower(), "v": str(value)}
+    raise TypeError(f"Can not encode a value of type {type(value).__name__} in a cursor.")
+
+
+def _decode_value(obj: dict):
+    if "$" in obj:
+        if not isinstance(obj.get("v"), str):
+            raise ValueError("Invalid cursor value.")
+        return _DECODERS[obj["$"]](obj["v"])
+    return obj
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort key of a row in an opaque cursor."""
+    data = json.dumps(values, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor made by encode_cursor."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data, object_hook=_decode_value)
+    except (binascii.Error, ValueError, KeyError, TypeError, ArithmeticError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'.") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor '{cursor}'.")
+    return values
+
+
+def _selected_table(statement: sqlalchemy.Select):
+    """
+    Return the table of the first selected column (the selected entity), which
+    is also the first table of a join.
+    """
+    for column in statement.selected_columns:
+        table = getattr(column, "table", None)
+        if table is not None and hasattr(table, "primary_key"):
+            return table
+    return None
+
+
+def _order_columns(
+    statement: sqlalchemy.Select, order_by: list[OrderBy] | None
+) -> list[tuple[sqlalchemy.ColumnElement, bool]]:
+    """
+    Return the sort columns and their direction (True for descending).
+    Names are columns of the selected entity. Its primary key is added to
+    make the order unique.
+    """
+    table = _selected_table(statement)
+    primary_key = list(table.primary_key) if table is not None else []
+
+    columns = []
+    for item in order_by or []:
+        descending = False
+        if isinstance(item, str):
+            descending = item.startswith("-")
+            name = item.lstrip("-")
+            if table is None or name not in table.c:
+                raise ValueError(f"Unknown sort column '{name}'.")
+            item = table.c[name]
+        if hasattr(item, "__clause_element__"):
+            item = item.__clause_element__()
+        if isinstance(item, sqlalchemy.UnaryExpression) and item.modifier in (
+            operators.desc_op,
+            operators.asc_op,
+        ):
+            descending = item.modifier is operators.desc_op
+            item = item.element
+        columns.append((item, descending))
+
+    # The primary key follows the direction of the last sort column, so that
+    # a single index can serve the whole order.
+    descending = columns[-1][1] if columns else False
+    for column in primary_key:
+        if not any(column.compare(sort_column) for sort_column, _ in columns):
+            columns.append((column, descending))
+    if not columns:
+        raise ValueError(
+            "The query has no primary key, the parameter 'order_by' is required."
+        )
+    return columns
+
+
+# Dialects where NULL values sort after the other values in ascending order.
+# The others (SQLite, MySQL, MariaDB, SQL Server) sort them first.
+_NULLS_HIGH_DIALECTS = {"postgresql", "oracle", "duckdb"}
+# Dialects whose default NULL position is not mirrored in descending order,
+# where it is written explicitly.
+_EXPLICIT_NULLS_DIALECTS = {"duckdb"}
+
+
+def _nullable(column: sqlalchemy.ColumnElement) -> bool:
+    return getattr(column, "nullable", True)
+
+
+def _nulls_after(dialect: str, descending: bool) -> bool:
+    """Return True if NULL values come after the other values in the scan."""
+    return (dialect in _NULLS_HIGH_DIALECTS) != descending
+
+
+def _order_clauses(
+    columns: list[tuple[sqlalchemy.ColumnElement, bool]], dialect: str
+) -> list[sqlalchemy.ColumnElement]:
+    """
+    Keep the native NULL position of the dialect, so that the order can be
+    read from an index.
+    """
+    clauses = []
+    for column, descending in columns:
+        clause = column.desc() if descending else column.asc()
+        if dialect in _EXPLICIT_NULLS_DIALECTS and _nullable(column):
+            if _nulls_after(dialect, descending):
+                clause = clause.nulls_last()
+            else:
+                clause = clause.nulls_first()
+        clauses.append(clause)
+    return clauses
+
+
+def _equals(column: sqlalchemy.ColumnElement, value: Any) -> sqlalchemy.ColumnElement:
+    return column.is_(None) if value is None else column == value
+
+
+def _after(
+    column: sqlalchemy.ColumnElement, descending: bool, value: Any, dialect: str
+) -> sqlalchemy.ColumnElement | None:
+    """Return the condition of the values after value, None if there are none."""
+    nulls_after = _nulls_after(dialect, descending) and _nullable(column)
+    if value is None:
+        return None if nulls_after else column.is_not(None)
+    after = column < value if descending else column > value
+    if nulls_after:
+        after = sqlalchemy.or_(after, column.is_(None))
+    return after
+
+
+def _keyset_predicate(
+    columns: list[tuple[sqlalchemy.ColumnElement, bool]], values: list, dialect: str
+) -> sqlalchemy.ColumnElement | None:
+    """
+    Build (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ..., which works on every
+    dialect, unlike row value comparisons. Return None if no row can follow.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(columns):
+        after = _after(column, descending, values[i], dialect)
+        if after is not None:
+            equals = [_equals(columns[j][0], values[j]) for j in range(i)]
+            clauses.append(sqlalchemy.and_(*equals, after))
+    return sqlalchemy.or_(*clauses) if clauses else None
+
+
+def _seek_conditions(
+    columns: list[tuple[sqlalchemy.ColumnElement, bool]], values: list, dialect: str
+) -> list[sqlalchemy.ColumnElement]:
+    """
+    Return the conditions of the rows after the cursor, one query each, in
+    the order of the scan. Each condition starts with a range on the first
+    sort column, so that the query seeks in an index of that column. The NULL
+    values of the first column are read by a separate query instead of an
+    OR, which would prevent the use of the index.
+    """
+    (column, descending), value = columns[0], values[0]
+    nulls_after = _nulls_after(dialect, descending) and _nullable(column)
+    tail = _keyset_predicate(columns[1:], values[1:], dialect)
+
+    conditions = []
+    if value is None:
+        if tail is not None:
+            conditions.append(sqlalchemy.and_(column.is_(None), tail))
+        if not nulls_after:
+            conditions.append(column.is_not(None))
+        return conditions
+
+    strictly_after = column < value if descending else column > value
+    if tail is None:
+        conditions.append(strictly_after)
+    else:
+        bound = column <= value if descending else column >= value
+        conditions.append(
+            sqlalchemy.and_(
+                bound,
+                sqlalchemy.or_(strictly_after, sqlalchemy.and_(column == value, tail)),
+            )
+        )
+    if nulls_after:
+        conditions.append(column.is_(None))
+    return conditions
+
+
+def _check_selected(
+    statement: sqlalchemy.Select, columns: list[tuple[sqlalchemy.ColumnElement, bool]]
+):
+    """Raise ValueError if a sort column can not be read from the results."""
+    selected = list(statement.selected_columns)
+    if isinstance(statement, SelectOfScalar):
+        # Only the first column is returned, unless it is an entity.
+        description = statement.column_descriptions[0]
+        entity = description.get("entity")
+        if entity is None or description["expr"] is not entity:
+            selected = selected[:1]
+    for column, _ in columns:
+        if not any(column.compare(other) for other in selected):
+            raise ValueError(
+                f"The sort column '{column.key}' must be selected by the query."
+            )
+
+
+def _row_value(item: Any, column: sqlalchemy.ColumnElement):
+    """
+    Read the value of a sort column in a result: a row of columns and
+    entities, an entity, or a scalar of a query selecting one column.
+    """
+    if isinstance(item, sqlalchemy.Row):
+        try:
+            return item._mapping[column]
+        except KeyError:
+            values = list(item)
+    else:
+        values = [item]
+    for value in values:
+        mapper = sqlalchemy.inspect(type(value), raiseerr=False)
+        if mapper is None:
+            continue
+        for prop in mapper.column_attrs:
+            if any(column.compare(other) for other in prop.columns):
+                return getattr(value, prop.key)
+    if isinstance(item, sqlalchemy.Row):
+        raise ValueError(f"The sort column '{column.key}' is not in the results.")
+    return item
+
+
+def paginate(
+    session: Session,
+    statement: Any,
+    order_by: list[OrderBy] | None = None,
+    page_size: int = 100,
+    after: Optional[str] = None,
+) -> Page:
+    """
+    Return a page of a query, using keyset pagination. statement can be a
+    select or a SQLModel class. Sort columns are names of the selected entity
+    (prefixed by '-' for descending), columns or column.desc(). They must be
+    selected by the query. NULL values are sorted as the database sorts them:
+    first in ascending order on SQLite, MySQL, MariaDB and SQL Server, last on
+    PostgreSQL and DuckDB.
+    """
+    if page_size < 1:
+        raise ValueError("The parameter 'page_size' must be at least 1.")
+    if not isinstance(statement, sqlalchemy.Select):
+        statement = sqlmodel.select(statement)
+
+    dialect = session.get_bind().dialect.name
+    columns = _order_columns(statement, order_by)
+    _check_selected(statement, columns)
+    conditions = [None]
+    if after is not None:
+        values = decode_cursor(after)
+        if len(values) != len(columns):
+            raise ValueError(f"The cursor '{after}' does not match the sort columns.")
+        conditions = _seek_conditions(columns, values, dialect)
+    statement = statement.order_by(None).order_by(*_order_clauses(columns, dialect))
+
+    items = []
+    for condition in conditions:
+        query = statement if condition is None else statement.where(condition)
+        items.extend(session.exec(query.limit(page_size + 1 - len(items))).all())
+        if len(items) > page_size:
+            break
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(
+            [_row_value(items[-1], column) for column, _ in columns]
+        )
+    return Page(items, next_cursor)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import os
+import tempfile
+from datetime import date
+from typing import Any, Iterator, Optional
+
+import sqlalchemy
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required to fetch arrow results. (pip install easydbs[arrow])"
+        ) from e
+    return pyarrow
+
+
+def _arrow_type(pa, type_: sqlalchemy.types.TypeEngine):
+    """Return the arrow type of a sqlalchemy type, or None to infer it."""
+    try:
+        python_type = type_.python_type
+    except NotImplementedError:
+        return None
+    return {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bytes: pa.binary(),
+        date: pa.date32(),
+    }.get(python_type)
+
+
+def _declared_types(pa, query: Any, names: list[str]) -> list:
+    """Return the arrow types of the columns declared by the query."""
+    columns = getattr(query, "selected_columns", None)
+    if columns is None or len(columns) != len(names):
+        return [None] * len(names)
+    return [_arrow_type(pa, column.type) for column in columns]
+
+
+def _cast(pa, batch, schema):
+    """Cast a record batch to schema. Columns of the same type are not copied."""
+    if batch.schema.equals(schema):
+        return batch
+    return pa.Table.from_batches([batch]).cast(schema).to_batches()[0]
+
+
+class ArrowResult:
+    """
+    Result of a query stored as arrow record batches. The first batches are
+    kept in memory, the others are read from memory-mapped arrow IPC files
+    without copy. Batches keep the schema they were stored with, and are cast
+    to the schema of the result only when they are read: the columns whose
+    type was promoted are copied, the others are not.
+    Call close() (or use a with block) to delete the files.
+    """
+
+    def __init__(
+        self,
+        schema,
+        batches: list,
+        paths: Optional[list[str]] = None,
+        sources: Optional[list] = None,
+    ):
+        self._pa = _import_pyarrow()
+        self.schema = schema
+        self.paths = paths or []
+        self._sources = sources or []
+        self._batches = batches
+        self._offsets = list(itertools.accumulate(batch.num_rows for batch in batches))
+
+    def __repr__(self):
+        return f"<ArrowResult(rows={len(self)}, spilled={self.spilled})>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._offsets[-1] if self._offsets else 0
+
+    def __getitem__(self, index):
+        """Return a row as a dict, or a slice of rows as a pyarrow Table."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Slices with a step are not supported.")
+            return self._pa.Table.from_batches(
+                self._slice(start, stop), schema=self.schema
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ArrowResult index out of range.")
+        return self._slice(index, index + 1)[0].to_pylist()[0]
+
+    @property
+    def spilled(self) -> bool:
+        """True if a part of the result is stored on disk."""
+        return bool(self.paths)
+
+    def iter_batches(self) -> Iterator:
+        """Yield the record batches of the result."""
+        for batch in self._batches:
+            yield _cast(self._pa, batch, self.schema)
+
+    def to_table(self):
+        """Return the result as a pyarrow Table."""
+        return self._pa.Table.from_batches(self.iter_batches(), schema=self.schema)
+
+    def close(self):
+        """Release the batches and delete the spill files."""
+        self._batches = []
+        self._offsets = []
+        for source in self._sources:
+            source.close()
+        self._sources = []
+        for path in self.paths:
+            os.remove(path)
+        self.paths = []
+
+    def _slice(self, start: int, stop: int) -> list:
+        """Return the rows from start to stop, cast to the result schema."""
+        batches = []
+        i = bisect.bisect_right(self._offsets, start)
+        while start < stop and i < len(self._batches):
+            batch_start = self._offsets[i] - self._batches[i].num_rows
+            length = min(stop, self._offsets[i]) - start
+            batch = self._batches[i].slice(start - batch_start, length)
+            batches.append(_cast(self._pa, batch, self.schema))
+            start += length
+            i += 1
+        return batches
+
+
+def fetch_arrow(
+    engine: sqlalchemy.Engine,
+    query: Any,
+    params: Optional[dict] = None,
+    memory_budget: int = 256 * 1024 * 1024,
+    batch_size: int = 10_000,
+    schema=None,
+) -> ArrowResult:
+    """
+    Stream the rows of a query in arrow record batches of batch_size rows.
+    Once the batches in memory exceed memory_budget bytes, the next ones are
+    written to temporary arrow IPC files.
+    Without schema, the types come from the sqlalchemy types of the query when
+    they are known, and are inferred otherwise. Inferred types are promoted
+    while the rows are read (e.g. a column of NULL values then of strings is
+    a string column). A new file is started when the types of the spilled
+    batches change. Batches are cast to the final schema when they are read.
+    """
+    pa = _import_pyarrow()
+    if isinstance(query, str):
+        query = sqlalchemy.text(query)
+
+    fixed_schema = schema is not None
+    batches = []
+    in_memory = 0
+    paths = []
+    sink = writer = file_schema = None
+    try:
+        with engine.connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, yield_per=batch_size
+            ).execute(query, params or {})
+            names = list(result.keys())
+            if fixed_schema:
+                types = [field.type for field in schema]
+            else:
+                types = _declared_types(pa, query, names)
+            for rows in result.partitions(batch_size):
+                arrays = [
+                    pa.array(column, type=type_)
+                    for column, type_ in zip(zip(*rows), types)
+                ]
+                if fixed_schema:
+                    batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+                else:
+                    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+                    schema = (
+                        batch.schema
+                        if schema is None
+                        else pa.unify_schemas(
+                            [schema, batch.schema], promote_options="permissive"
+                        )
+                    )
+
+                if writer is None and in_memory + batch.nbytes <= memory_budget:
+                    batches.append(batch)
+                    in_memory += batch.nbytes
+                    continue
+                if writer is not None and not schema.equals(file_schema):
+                    writer.close()
+                    sink.close()
+                    writer = None
+                if writer is None:
+                    fd, path = tempfile.mkstemp(prefix="easydbs-", suffix=".arrow")
+                    os.close(fd)
+                    paths.append(path)
+                    file_schema = schema
+                    sink = pa.OSFile(path, "wb")
+                    writer = pa.ipc.new_file(sink, file_schema)
+                writer.write_batch(_cast(pa, batch, file_schema))
+        if writer is not None:
+            writer.close()
+            sink.close()
+    except BaseException:
+        if sink is not None:
+            sink.close()
+        for path in paths:
+            os.remove(path)
+        raise
+
+    if schema is None:
+        schema = pa.schema(
+            [(name, type_ or pa.null()) for name, type_ in zip(names, types)]
+        )
+    sources = []
+    for path in paths:
+        source = pa.memory_map(path, "r")
+        sources.append(source)
+        reader = pa.ipc.open_file(source)
+        batches.extend(reader.get_batch(i) for i in range(reader.num_record_batches))
+    return ArrowResult(schema, batches, paths, sources)
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import easydbs
+from easydbs.admission import AdmissionController
+from easydbs.exceptions import AdmissionRejectedError
+from sqlmodel import Session
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met before the timeout.")
+        time.sleep(0.001)
+
+
+def test_decorator_with_limit():
+    sqlite = easydbs.connect(easydbs.SQLITE)
+    sqlite.limit_concurrency(1)
+
+    @sqlite
+    def select_one(session: Session):
+        return session.exec("SELECT 1").first()
+
+    assert select_one() == (1,)
+    metrics = sqlite.admission.metrics()
+    assert metrics["active"] == 0
+    assert metrics["admitted"] == 1
+
+
+def test_reject_when_queue_is_full():
+    admission = AdmissionController(1, max_queue=0)
+    admission.acquire()
+    with pytest.raises(AdmissionRejectedError):
+        admission.acquire()
+    admission.release()
+    assert admission.metrics()["rejected"] == 1
+
+
+def test_reject_after_timeout():
+    admission = AdmissionController(1, max_queue=1, timeout=0.01)
+    admission.acquire()
+    with pytest.raises(AdmissionRejectedError):
+        admission.acquire()
+    metrics = admission.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["rejected"] == 1
+
+
+def test_priority_order():
+    admission = AdmissionController(1, max_queue=2)
+    admission.acquire()
+    order = []
+
+    def worker(priority):
+        admission.acquire(priority)
+        order.append(priority)
+        admission.release()
+
+    low = threading.Thread(target=worker, args=(0,))
+    low.start()
+    wait_until(lambda: admission.metrics()["queue_depth"] == 1)
+    high = threading.Thread(target=worker, args=(10,))
+    high.start()
+    wait_until(lambda: admission.metrics()["queue_depth"] == 2)
+    admission.release()
+    low.join(timeout=5)
+    high.join(timeout=5)
+    assert order == [10, 0]
+    assert admission.metrics()["active"] == 0
+
+
+def test_interrupted_wait(monkeypatch):
+    admission = AdmissionController(1, max_queue=1)
+    admission.acquire()
+
+    class InterruptedEvent(threading.Event):
+        def wait(self, timeout=None):
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(threading, "Event", InterruptedEvent)
+    with pytest.raises(KeyboardInterrupt):
+        admission.acquire()
+    monkeypatch.undo()
+    assert admission.metrics()["queue_depth"] == 0
+    admission.release()
+    assert admission.metrics()["active"] == 0
+
+
+def test_wake_closed_loop():
+    admission = AdmissionController(1, max_queue=2)
+    admission.acquire()
+    loop = asyncio.new_event_loop()
+    loop.close()
+    admission._enqueue(1, lambda: loop.call_soon_threadsafe(print))
+    acquired = threading.Event()
+
+    def worker():
+        admission.acquire()
+        acquired.set()
+        admission.release()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    wait_until(lambda: admission.metrics()["queue_depth"] == 2)
+    admission.release()
+    assert acquired.wait(timeout=5)
+    thread.join(timeout=5)
+    assert admission.metrics()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_limit():
+    sqlite = easydbs.connect(easydbs.SQLITE)
+    sqlite.limit_concurrency(2, max_queue=10)
+    running = 0
+    peak = 0
+
+    @sqlite(priority=1)
+    async def select_one(session: Session):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return session.exec("SELECT 1").first()
+
+    results = await asyncio.gather(*(select_one() for _ in range(6)))
+    assert results == [(1,)] * 6
+    assert peak == 2
+    metrics = sqlite.admission.metrics()
+    assert metrics["admitted"] == 6
+    assert metrics["active"] == 0
+    assert metrics["max_wait"] > 0
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["sqlalchemy", "sqlmodel", "asyncio"]
+
+# Cumulative import time allowed for `import easydbs`, in microseconds.
+IMPORT_TIME_BUDGET = 100_000
+
+
+def run_python(code, *options):
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_does_not_load_heavy_modules():
+    result = run_python(
+        "import sys, easydbs; easydbs.SQLITE; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_attributes():
+    result = run_python(
+        "import sys, easydbs; easydbs.connect; "
+        "print('sqlalchemy' in sys.modules, easydbs.ConnectionManager.__name__)"
+    )
+    assert result.stdout.split() == ["True", "ConnectionManager"]
+
+
+def test_import_time():
+    result = run_python("import easydbs", "-X", "importtime")
+    for line in result.stderr.splitlines():
+        _, cumulative_us, name = (part.strip() for part in line.split("|"))
+        if name == "easydbs":
+            assert int(cumulative_us) < IMPORT_TIME_BUDGET
+            break
+    else:
+        raise AssertionError("easydbs not found in the import time report.")
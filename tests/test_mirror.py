@@ -0,0 +1,84 @@
+import os
+import time
+from datetime import timedelta
+
+import pytest
+import easydbs
+
+
+@pytest.fixture
+def source(tmp_path):
+    conn = easydbs.connect(easydbs.SQLITE, database=str(tmp_path / "source.db"))
+    with conn.session() as session:
+        session.exec("CREATE TABLE hero (id INTEGER PRIMARY KEY, name TEXT)")
+        session.exec("INSERT INTO hero VALUES (1, 'Peter Parker')")
+        session.commit()
+    return conn
+
+
+def insert_hero(conn):
+    with conn.session() as session:
+        session.exec("INSERT INTO hero VALUES (2, 'Bruce Wayne')")
+        session.commit()
+
+
+def count_heroes(conn):
+    with conn.session() as session:
+        return session.exec("SELECT COUNT(*) FROM hero").one()[0]
+
+
+@pytest.mark.parametrize("target", [easydbs.DUCKDB, easydbs.SQLITE], ids=["duckdb", "sqlite"])
+def test_mirror(source, tmp_path, target):
+    database = str(tmp_path / f"mirror.{target.value}")
+    mirror = source.mirror(["hero"], target=target, database=database)
+    cm = easydbs.ConnectionManager()
+    assert cm[mirror.connection.id] is mirror.connection
+    with mirror.connection.session() as session:
+        assert session.exec("SELECT * FROM hero").all() == [(1, "Peter Parker")]
+
+    insert_hero(source)
+    assert count_heroes(mirror.connection) == 1
+    mirror.refresh()
+    assert count_heroes(mirror.connection) == 2
+
+
+def test_mirror_scheduled_refresh(source):
+    mirror = source.mirror(["hero"], refresh=0.05)
+    insert_hero(source)
+    deadline = time.monotonic() + 5
+    while count_heroes(mirror.connection) != 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    mirror.stop()
+    assert count_heroes(mirror.connection) == 2
+    assert mirror.last_error is None
+
+
+def test_mirror_close(source):
+    mirror = source.mirror(["hero"])
+    tmpdir = mirror.tmpdir
+    assert os.path.isdir(tmpdir)
+    mirror.close()
+    assert not os.path.exists(tmpdir)
+    assert mirror.connection not in easydbs.ConnectionManager().connections()
+
+
+def test_mirror_failed_copy(source):
+    cm = easydbs.ConnectionManager()
+    before = list(cm.connections())
+    with pytest.raises(Exception):
+        source.mirror(["no_such_table"])
+    assert list(cm.connections()) == before
+
+
+@pytest.mark.parametrize("refresh", [0, -1, timedelta(0)])
+def test_mirror_invalid_refresh(source, refresh):
+    cm = easydbs.ConnectionManager()
+    before = list(cm.connections())
+    with pytest.raises(ValueError):
+        source.mirror(["hero"], refresh=refresh)
+    assert list(cm.connections()) == before
+
+
+def test_mirror_invalid_target(source):
+    with pytest.raises(ValueError):
+        source.mirror(["hero"], target=easydbs.POSTGRE)
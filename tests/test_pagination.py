@@ -0,0 +1,191 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+import easydbs
+from easydbs.pagination import decode_cursor, encode_cursor
+import sqlalchemy
+from sqlalchemy import Column, Integer, MetaData, Table, event
+from sqlmodel import Field, SQLModel, select
+
+
+class Villain(SQLModel, table=True):
+    __tablename__ = "villain"
+    __table_args__ = {'extend_existing': True}
+    id: int | None = Field(default=None, primary_key=True)
+    name: str
+    power: int
+    rank: int | None = Field(default=None, index=True)
+
+
+class Lair(SQLModel, table=True):
+    __tablename__ = "lair"
+    __table_args__ = {'extend_existing': True}
+    id: int | None = Field(default=None, primary_key=True)
+    villain_id: int
+    city: str
+
+
+def rank(i):
+    return None if i % 3 == 0 else i % 4
+
+
+sqlite = easydbs.connect(easydbs.SQLITE)
+sqlite.create_tables(tables_names=["villain", "lair"])
+with sqlite.session() as session:
+    for i in range(1, 26):
+        session.add(Villain(id=i, name=f"villain {i:02}", power=i % 5, rank=rank(i)))
+        session.add(Lair(id=i, villain_id=i, city="Gotham" if i % 2 else "Metropolis"))
+    session.commit()
+
+
+def all_pages(*args, **kwargs):
+    items = []
+    after = None
+    while True:
+        page = sqlite.paginate(*args, after=after, **kwargs)
+        items.extend(page)
+        after = page.next_cursor
+        if after is None:
+            return items
+
+
+def test_paginate_model():
+    page = sqlite.paginate(Villain, page_size=10)
+    assert [villain.id for villain in page] == list(range(1, 11))
+    page = sqlite.paginate(Villain, page_size=10, after=page.next_cursor)
+    assert [villain.id for villain in page] == list(range(11, 21))
+    page = sqlite.paginate(Villain, page_size=10, after=page.next_cursor)
+    assert [villain.id for villain in page] == list(range(21, 26))
+    assert page.next_cursor is None
+
+
+def test_paginate_order_by():
+    villains = all_pages(Villain, order_by=["-power"], page_size=4)
+    expected = sorted(range(1, 26), key=lambda i: (i % 5, i), reverse=True)
+    assert [villain.id for villain in villains] == expected
+
+
+def test_paginate_select_columns():
+    statement = select(Villain.id, Villain.power).where(Villain.power < 3)
+    rows = all_pages(statement, order_by=[Villain.power.desc()], page_size=3)
+    expected = sorted(
+        ((i, i % 5) for i in range(1, 26) if i % 5 < 3),
+        key=lambda row: (row[1], row[0]),
+        reverse=True,
+    )
+    assert [tuple(row) for row in rows] == expected
+
+
+@pytest.mark.parametrize("order_by", ["rank", "-rank"])
+def test_paginate_nullable_column(order_by):
+    villains = all_pages(Villain, order_by=[order_by], page_size=4)
+    # SQLite sorts NULL values first.
+    expected = sorted(range(1, 26), key=lambda i: (rank(i) is not None, rank(i) or 0, i))
+    if order_by.startswith("-"):
+        expected.reverse()
+    assert [villain.id for villain in villains] == expected
+
+
+@pytest.mark.parametrize("order_by", ["rank", "-rank"])
+def test_paginate_uses_index(order_by):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(sqlite.engine, "before_cursor_execute", record)
+    try:
+        all_pages(Villain, order_by=[order_by], page_size=4)
+    finally:
+        event.remove(sqlite.engine, "before_cursor_execute", record)
+
+    assert len(statements) > 7
+    with sqlite.engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = " ".join(
+                row[-1]
+                for row in conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            )
+            assert "ix_villain_rank" in plan
+            assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_paginate_nullable_column_duckdb(order):
+    duckdb = easydbs.connect(easydbs.DUCKDB)
+    metadata = MetaData()
+    ranked = Table(
+        "ranked",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("rank", Integer),
+    )
+    metadata.create_all(duckdb.engine)
+    with duckdb.engine.begin() as conn:
+        conn.execute(ranked.insert(), [{"id": i, "rank": rank(i)} for i in range(1, 26)])
+
+    sort_column = ranked.c.rank.desc() if order == "desc" else ranked.c.rank
+    items = []
+    after = None
+    while True:
+        page = duckdb.paginate(
+            sqlalchemy.select(ranked), order_by=[sort_column], page_size=4, after=after
+        )
+        items.extend(page)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+    # Like PostgreSQL, NULL values are sorted last in ascending order.
+    expected = sorted(range(1, 26), key=lambda i: (rank(i) is None, rank(i) or 0, i))
+    if order == "desc":
+        expected.reverse()
+    assert [row.id for row in items] == expected
+
+
+def test_paginate_multiple_entities():
+    statement = select(Villain, Lair).join(Lair, Lair.villain_id == Villain.id)
+    rows = all_pages(statement, page_size=3)
+    assert [(villain.id, lair.villain_id) for villain, lair in rows] == [
+        (i, i) for i in range(1, 26)
+    ]
+
+
+def test_paginate_sort_column_not_selected():
+    with pytest.raises(ValueError):
+        sqlite.paginate(select(Villain.name), page_size=100)
+    with pytest.raises(ValueError):
+        sqlite.paginate(select(Villain.__table__), order_by=["rank"], page_size=100)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        encode_cursor([1, 2]),
+        encode_cursor([{"$": "decimal", "v": "x"}]),
+        encode_cursor([{"$": "datetime", "v": 5}]),
+        encode_cursor([{"$": "uuid", "v": None}]),
+        encode_cursor([{"$": "unknown", "v": "x"}]),
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        sqlite.paginate(Villain, after=cursor)
+
+
+def test_cursor_types():
+    values = [
+        1,
+        "a",
+        None,
+        datetime(2024, 1, 1, 12),
+        date(2024, 1, 1),
+        Decimal("1.50"),
+        uuid.UUID(int=1),
+    ]
+    assert decode_cursor(encode_cursor(values)) == values
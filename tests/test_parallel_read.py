@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import sys
+
+import pytest
+import easydbs
+from easydbs.dbapi import Connection
+from sqlmodel import Session
+
+
+@pytest.fixture
+def sqlite_file(tmp_path):
+    conn = easydbs.connect(easydbs.SQLITE, database=str(tmp_path / "parallel.db"))
+    with conn.session() as session:
+        session.exec("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(1, 101):
+            session.exec(
+                "INSERT INTO item VALUES (:id, :name)",
+                params={"id": i, "name": f"item {i}"},
+            )
+        session.commit()
+    return conn
+
+
+def test_parallel_read(sqlite_file):
+    batches = list(
+        sqlite_file.parallel_read("item", "id", partitions=4, processes=2)
+    )
+    assert len(batches) == 4
+    rows = [row for batch in batches for row in batch]
+    assert [row[0] for row in rows] == list(range(1, 101))
+    assert rows[0] == (1, "item 1")
+
+
+def test_parallel_read_empty_table(sqlite_file):
+    with sqlite_file.session() as session:
+        session.exec("DELETE FROM item")
+        session.commit()
+    assert list(sqlite_file.parallel_read("item", "id", partitions=4)) == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork is not available")
+def test_engine_reset_after_fork(sqlite_file):
+    sqlite_file.connect()
+    parent_pool = sqlite_file.engine.pool
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+
+    def child():
+        @sqlite_file
+        def count(session: Session):
+            return session.exec("SELECT COUNT(*) FROM item").one()[0]
+
+        queue.put(
+            (
+                sqlite_file.engine.pool is not parent_pool,
+                sqlite_file._pid == os.getpid(),
+                count(),
+            )
+        )
+
+    process = ctx.Process(target=child)
+    process.start()
+    process.join()
+    assert queue.get(timeout=5) == (True, True, 100)
+
+
+def test_parallel_read_invalid_partitions(sqlite_file):
+    with pytest.raises(ValueError):
+        sqlite_file.parallel_read("item", "id", partitions=0)
+
+
+def test_parallel_read_stop_early(sqlite_file):
+    reader = sqlite_file.parallel_read("item", "id", partitions=50, processes=1)
+    assert next(reader)[0] == (1, "item 1")
+    reader.close()
+
+
+def test_parallel_read_null_partition(sqlite_file):
+    with sqlite_file.session() as session:
+        session.exec("CREATE TABLE tag (rank INTEGER, name TEXT)")
+        session.exec("INSERT INTO tag VALUES (1, 'a'), (NULL, 'b'), (2, 'c')")
+        session.commit()
+    batches = list(sqlite_file.parallel_read("tag", "rank", partitions=2))
+    assert batches == [[(1, "a")], [(2, "c")], [(None, "b")]]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fork is not available")
+def test_unregistered_connection_reset_after_fork(tmp_path):
+    conn = Connection(easydbs.SQLITE, database=str(tmp_path / "alone.db"))
+    assert conn not in easydbs.ConnectionManager().connections()
+    parent_pool = conn.engine.pool
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+
+    def child():
+        conn.close()
+        queue.put((conn.engine.pool is not parent_pool, conn._pid == os.getpid()))
+
+    process = ctx.Process(target=child)
+    process.start()
+    process.join()
+    assert queue.get(timeout=5) == (True, True)
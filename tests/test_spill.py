@@ -0,0 +1,116 @@
+import os
+
+import pytest
+import easydbs
+
+pa = pytest.importorskip("pyarrow")
+
+sqlite = easydbs.connect(easydbs.SQLITE)
+with sqlite.session() as session:
+    session.exec("CREATE TABLE IF NOT EXISTS measure (id INTEGER PRIMARY KEY, value REAL)")
+    session.exec("DELETE FROM measure")
+    for i in range(1000):
+        session.exec(
+            "INSERT INTO measure VALUES (:id, :value)",
+            params={"id": i, "value": i / 10},
+        )
+    session.exec("CREATE TABLE IF NOT EXISTS report (id INTEGER PRIMARY KEY, note TEXT, amount)")
+    session.exec("DELETE FROM report")
+    for i in range(300):
+        session.exec(
+            "INSERT INTO report VALUES (:id, :note, :amount)",
+            params={
+                "id": i,
+                "note": None if i < 100 else f"note {i}",
+                "amount": i if i < 200 else i + 0.5,
+            },
+        )
+    session.commit()
+
+
+def test_fetch_in_memory():
+    with sqlite.fetch_arrow("SELECT * FROM measure ORDER BY id") as result:
+        assert not result.spilled
+        assert len(result) == 1000
+        assert result[0] == {"id": 0, "value": 0.0}
+
+
+def test_fetch_spilled():
+    result = sqlite.fetch_arrow(
+        "SELECT * FROM measure ORDER BY id", memory_budget=2000, batch_size=100
+    )
+    paths = result.paths
+    assert result.spilled
+    assert len(paths) == 1
+    assert os.path.exists(paths[0])
+    assert len(result) == 1000
+    assert len(list(result.iter_batches())) == 10
+    assert result[-1] == {"id": 999, "value": 99.9}
+    assert result[150:153].column("id").to_pylist() == [150, 151, 152]
+    assert result.to_table().column("id").to_pylist() == list(range(1000))
+    result.close()
+    assert not os.path.exists(paths[0])
+
+
+def test_fetch_with_params_and_schema():
+    schema = pa.schema([("id", pa.int32())])
+    result = sqlite.fetch_arrow(
+        "SELECT id FROM measure WHERE id < :limit", params={"limit": 5}, schema=schema
+    )
+    assert result.schema == schema
+    assert len(result) == 5
+
+
+def test_fetch_empty():
+    result = sqlite.fetch_arrow("SELECT * FROM measure WHERE id < 0")
+    assert len(result) == 0
+    assert result.schema.names == ["id", "value"]
+
+
+@pytest.mark.parametrize("memory_budget", [10**9, 2000], ids=["memory", "spilled"])
+def test_fetch_promoted_types(memory_budget):
+    with sqlite.fetch_arrow(
+        "SELECT * FROM report ORDER BY id", memory_budget=memory_budget, batch_size=100
+    ) as result:
+        assert result.spilled == (memory_budget == 2000)
+        assert result.schema.field("note").type == pa.string()
+        assert result.schema.field("amount").type == pa.float64()
+        assert len(result) == 300
+        assert result[0] == {"id": 0, "note": None, "amount": 0.0}
+        assert result[150] == {"id": 150, "note": "note 150", "amount": 150.0}
+        assert result[250] == {"id": 250, "note": "note 250", "amount": 250.5}
+
+
+def test_fetch_declared_types():
+    from sqlalchemy import Integer, String, column, select, table
+
+    report = table("report", column("id", Integer), column("note", String))
+    query = select(report.c.id, report.c.note).order_by(report.c.id)
+    with sqlite.fetch_arrow(query, memory_budget=0, batch_size=100) as result:
+        assert len(result.paths) == 1
+        assert result.schema.field("note").type == pa.string()
+        assert result[299] == {"id": 299, "note": "note 299"}
+
+
+def test_promotion_keeps_spilled_batches_mapped():
+    with sqlite.engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS big (id INTEGER PRIMARY KEY, amount)")
+        conn.exec_driver_sql("DELETE FROM big")
+        conn.exec_driver_sql(
+            "INSERT INTO big VALUES (?, ?)",
+            [(i, i if i < 49_000 else i + 0.5) for i in range(50_000)],
+        )
+
+    memory_budget = 100_000
+    before = pa.total_allocated_bytes()
+    with sqlite.fetch_arrow(
+        "SELECT * FROM big ORDER BY id", memory_budget=memory_budget, batch_size=1000
+    ) as result:
+        assert len(result.paths) == 2
+        assert result.schema.field("amount").type == pa.float64()
+        # The spilled int batches are not cast when the result is built.
+        assert pa.total_allocated_bytes() - before < memory_budget * 1.5
+        assert result[10_000] == {"id": 10_000, "amount": 10_000.0}
+        assert result[49_999] == {"id": 49_999, "amount": 49_999.5}
+        assert result[999:1001].column("amount").to_pylist() == [999.0, 1000.0]
+        assert all(batch.schema == result.schema for batch in result.iter_batches())